@@ -1,90 +1,193 @@
-import re
+import asyncio
 import subprocess
+import threading
+
+from functools import lru_cache
+from itertools import chain
+
+from django.test.signals import setting_changed
 
 from django_cardano.settings import django_cardano_settings as settings
 
 from .exceptions import CardanoError
 
-# Output of 'transaction calculate-min-fee' command is presumed
-# to be of the exact form: '<int> Lovelace'
-MIN_FEE_RE = re.compile(r'(\d+)\s+Lovelace')
+# Command/subcommand strings (ex: 'query utxo') split into their argv components
+_COMMAND_CACHE = {}
+
+# Number of seconds for which arun() waits before checking again for a free CLI slot
+CLI_SLOT_POLL_INTERVAL = 0.01
+
+
+@lru_cache(maxsize=None)
+def _cli_semaphore():
+    """
+    :return: Semaphore bounding the number of concurrently running cardano-cli
+             processes, or None if CLI_MAX_CONCURRENCY leaves them unbounded
+    """
+    max_concurrency = settings.CLI_MAX_CONCURRENCY
+    return threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+
+
+@lru_cache(maxsize=None)
+def _network_args(network) -> tuple:
+    """
+    :param network: 'mainnet' or 'testnet'
+    :return: The corresponding cardano-cli argv components
+    """
+    if network == 'mainnet':
+        return '--mainnet',
+    elif network == 'testnet':
+        return '--testnet-magic', str(settings.TESTNET_MAGIC)
+    return ()
+
+
+def clear_cli_caches(*args, setting=None, **kwargs):
+    if setting in (None, 'DJANGO_CARDANO'):
+        _cli_semaphore.cache_clear()
+        _network_args.cache_clear()
+
+
+setting_changed.connect(clear_cli_caches)
+
+
+def _render_arg(arg) -> tuple:
+    """
+    :param arg: Argument name, or (argument name, argument value) tuple
+    :return: The corresponding cardano-cli argv components
+    """
+    if isinstance(arg, str):
+        return '--' + arg,
+    elif isinstance(arg, tuple) and len(arg) == 2:
+        return '--' + arg[0], arg[1]
+    return ()
+
+
+def _render_option(option_name, option_value) -> tuple:
+    """
+    :param option_name: Option name
+    :param option_value: None (for flags), a single value, or a list/tuple of values
+    :return: The corresponding cardano-cli argv components
+    """
+    if option_value is None:
+        return '--' + option_name,
+    elif isinstance(option_value, (list, tuple)):
+        return ('--' + option_name, *option_value)
+    return '--' + option_name, str(option_value)
 
-# Output of 'query utxo' command is presumed to yield an ASCII table
-# containing rows of the form: <TxHash>    <TxIx>      <Amount>
-UTXO_RE = re.compile(r'(\w+)\s+(\d+)\s+(.*)')
 
-ASSET_COUNT_RE = re.compile(r'(\d+)\s+(.*)')
+def _process_args(command, args, kwargs) -> list:
+    """
+    :param command: command/subcommand to invoke (ex: 'query utxo')
+    :param args:  Tuples containing optional argument name/value pairs
+    :param kwargs: Additional argument name/value pairs (consumed)
+    :return: The full cardano-cli argv
+    """
+    command_args = _COMMAND_CACHE.get(command)
+    if command_args is None:
+        command_args = _COMMAND_CACHE[command] = tuple(command.split())
+
+    process_args = [settings.CLI_PATH, *command_args]
+    process_args.extend(chain.from_iterable(map(_render_arg, args)))
+
+    # kwargs is a fresh dict local to the calling method, so it may be consumed directly
+    process_args.extend(_network_args(kwargs.pop('network', None)))
+
+    process_args.extend(chain.from_iterable(
+        _render_option(option_name, option_value)
+        for option_name, option_value in kwargs.items()
+    ))
+
+    # The arguments are handed to cardano-cli verbatim (i.e. not via a shell),
+    # so values containing spaces, such as the multi-asset values of --tx-out
+    # and --mint (ex: <addr>+<lovelace>+<quantity> <asset_id>), need no quoting.
+    return process_args
 
 
 class CardanoCLI:
     @classmethod
-    def run(cls, command, *args, **kwargs) -> str:
+    def run(cls, command, *args, text=True, pass_fds=(), **kwargs):
         """
         Invoke the specified cardano-cli command/subcommand
         The *args serve as a series of (arg_name, arg_value) tuples
         The **kwargs behave as singular command arguments.
 
-        :param command: command/subcommand to invoke
+        :param command: command/subcommand to invoke (ex: 'query utxo')
         :param args:  Tuples containing optional argument name/value pairs
+        :param text: Whether to decode the output (otherwise it is returned as bytes,
+                     which is preferable for output that is merely to be parsed as JSON)
+        :param pass_fds: File descriptors for cardano-cli to inherit (ex: /dev/fd/<n> arguments)
         :param kwargs: Additional argument name/value pairs
         :return: The cardano-cli command output written to stdout
         """
-        process_args = [settings.CLI_PATH] + command.split()
-
-        for arg in args:
-            if isinstance(arg, str):
-                process_args.append(f'--{arg}')
-            elif isinstance(arg, tuple) and len(arg) == 2:
-                process_args.append(f'--{arg[0]}')
-                process_args.append(arg[1])
-
-        options = dict(kwargs)
-        if 'network' in options:
-            if options['network'] == 'mainnet':
-                process_args.append('--mainnet')
-            elif options['network'] == 'testnet':
-                process_args += ['--testnet-magic', str(settings.TESTNET_MAGIC)]
-            del options['network']
-
-        for option_name, option_value in options.items():
-            process_args.append(f'--{option_name}')
-            if option_value is not None:
-                if isinstance(option_value, list):
-                    process_args += option_value
-                elif isinstance(option_value, tuple):
-                    process_args += list(option_value)
-                else:
-                    process_args.append(str(option_value))
+        process_args = _process_args(command, args, kwargs)
 
         subprocess_args = {
             'check': True,
             'capture_output': True,
             'env': {'CARDANO_NODE_SOCKET_PATH': settings.NODE_SOCKET_PATH},
+            'pass_fds': pass_fds,
         }
+        if text:
+            # Have the output decoded by subprocess itself
+            subprocess_args['encoding'] = 'utf-8'
 
-        if command == 'transaction build-raw':
-            # Iff the CLI command being invoked is "transaction build-raw",
-            # issue the stringified command in shell mode.
-            #
-            # The reason for this is that when performing a transaction
-            # that involved native tokens, the --tx-out argument(s) contain
-            # a space (ex: <addr>+<lovelace>+"<quantity> <asset_id>").
-            #
-            # For whatever reason, subprocess.run(...) does not permit the use
-            # of arguments containing spaces, thus the composed/executed command
-            # is not of the intended form and will therefore fail.
-            #
-            # Enabling shell mode allows the command to be invoked with spaces
-            # and quotation characters intact.
-            subprocess_args['shell'] = True
-            process_args = ' '.join(process_args)
-
+        semaphore = _cli_semaphore()
+        if semaphore is not None:
+            semaphore.acquire()
         try:
             completed_process = subprocess.run(process_args, **subprocess_args)
             if completed_process.returncode == 0:
-                return completed_process.stdout.decode().strip()
+                return completed_process.stdout.strip()
             else:
-                error_message = completed_process.stderr.decode().strip()
+                error_message = completed_process.stderr.strip()
                 raise CardanoError(error_message)
         except (FileNotFoundError, subprocess.CalledProcessError) as e:
             raise CardanoError(source_error=e)
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+    @classmethod
+    async def arun(cls, command, *args, text=True, pass_fds=(), **kwargs):
+        """
+        Asynchronous counterpart of run(), for use by coroutines (ex: async views)
+        that would otherwise block their event loop for the duration of the command.
+        """
+        process_args = _process_args(command, args, kwargs)
+
+        semaphore = _cli_semaphore()
+        if semaphore is not None:
+            # Wait for a slot without blocking the event loop (or tying up an executor thread)
+            while not semaphore.acquire(blocking=False):
+                await asyncio.sleep(CLI_SLOT_POLL_INTERVAL)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *process_args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                pass_fds=pass_fds,
+                env={'CARDANO_NODE_SOCKET_PATH': settings.NODE_SOCKET_PATH},
+            )
+            try:
+                stdout, stderr = await process.communicate()
+            except asyncio.CancelledError:
+                # Let the slot only be freed once cardano-cli has actually exited
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+                raise
+        except FileNotFoundError as e:
+            raise CardanoError(source_error=e)
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+        if process.returncode != 0:
+            raise CardanoError(source_error=subprocess.CalledProcessError(
+                process.returncode, process_args, stdout, stderr
+            ))
+
+        stdout = stdout.strip()
+        return stdout.decode('utf-8') if text else stdout
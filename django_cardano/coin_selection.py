@@ -0,0 +1,138 @@
+from itertools import accumulate
+from operator import itemgetter
+
+from django_cardano.settings import django_cardano_settings as settings
+
+from .shortcuts import largest_utxos
+
+# Upper bound on the number of nodes visited by a single branch-and-bound
+# search before giving up in favour of the fallback selection
+BNB_MAX_TRIES = 1000
+
+
+def branch_and_bound(utxos, target, fee_per_input=0, tolerance=0, max_inputs=None, max_tries=BNB_MAX_TRIES,
+                     type=settings.LOVELACE_UNIT) -> list:
+    """
+    Search (depth-first, bounded by max_tries) for the subset of the given
+    UTxOs whose value lies within [target, target + tolerance] and which
+    wastes the least: the excess over the target plus the cost of spending
+    each of its inputs.
+
+    :param utxos: Candidate UTxOs
+    :param target: Amount of the given asset type to be covered by the selection
+    :param fee_per_input: Fee incurred by each input added to the transaction
+    :param tolerance: Excess over the target that is acceptable
+    :param max_inputs: Maximum number of UTxOs to select (unbounded if None)
+    :param max_tries: Maximum number of nodes to visit in the search tree
+    :return: The selected UTxOs, or an empty list if no subset was found
+    """
+    candidates = []
+    for utxo in utxos:
+        # UTxOs costing more to spend than they are worth are never worth it
+        effective_value = utxo['Tokens'][type] - fee_per_input
+        if effective_value > 0:
+            candidates.append((effective_value, utxo))
+    candidates.sort(key=itemgetter(0), reverse=True)
+
+    values = [effective_value for effective_value, _ in candidates]
+    upper_bound = target + tolerance
+    value_count = len(values)
+
+    # Sums of the largest remaining values, such that the most that can
+    # still be added within max_inputs is known in constant time
+    value_sums = [0, *accumulate(values)]
+
+    selection = []
+    best_selection = None
+    best_waste = None
+    current_value = 0
+    available_value = sum(values)
+    index = 0
+
+    for _ in range(max_tries):
+        backtrack = False
+        if current_value + available_value < target or current_value > upper_bound:
+            backtrack = True
+        elif current_value >= target:
+            waste = current_value - target + len(selection) * fee_per_input
+            if best_waste is None or waste < best_waste:
+                best_selection = list(selection)
+                best_waste = waste
+            backtrack = True
+        elif max_inputs is not None and (
+            len(selection) >= max_inputs
+            or current_value + value_sums[min(index + max_inputs - len(selection), value_count)]
+            - value_sums[index] < target
+        ):
+            backtrack = True
+
+        if not backtrack:
+            # Explore the branch including the next (largest remaining) UTxO
+            current_value += values[index]
+            available_value -= values[index]
+            selection.append(index)
+            index += 1
+            continue
+
+        if not selection:
+            # The whole tree has been explored
+            break
+
+        # Restore the UTxOs omitted since the most recently selected one,
+        # then explore the branch omitting that one instead.
+        last_selected = selection.pop()
+        while index > last_selected + 1:
+            index -= 1
+            available_value += values[index]
+        current_value -= values[last_selected]
+
+        # Including a UTxO of equal value to the one just omitted
+        # would merely repeat the branch that was just explored.
+        while index < value_count and values[index] == values[last_selected]:
+            available_value -= values[index]
+            index += 1
+
+    if best_selection is None:
+        return []
+
+    return [candidates[index][1] for index in best_selection]
+
+
+def largest_first(utxos, target, fee_per_input=0, type=settings.LOVELACE_UNIT) -> list:
+    """
+    Select UTxOs in descending order of value until the target (plus the fee
+    incurred by each input) is covered, which takes the fewest inputs possible.
+    If the UTxOs are insufficient to cover the target, all of them are selected.
+    """
+    selected_utxos = []
+    selected_value = 0
+
+    for utxo in largest_utxos(utxos, type=type):
+        selected_utxos.append(utxo)
+        selected_value += utxo['Tokens'][type] - fee_per_input
+        if selected_value >= target:
+            break
+
+    return selected_utxos
+
+
+def select_utxos(utxos, target, fee_per_input=0, tolerance=0, type=settings.LOVELACE_UNIT) -> list:
+    """
+    Select the UTxOs with which to cover the target. Largest-first determines
+    the fewest inputs (and so the lowest fee) with which that can be done.
+    A branch-and-bound selection is preferred only if it needs no more inputs
+    than that: any excess over the target is merely returned as change, so it
+    is not worth paying for additional inputs to avoid.
+    If the target cannot be covered, all UTxOs are selected.
+    """
+    selected_utxos = largest_first(utxos, target, fee_per_input=fee_per_input, type=type)
+    selected_value = sum(utxo['Tokens'][type] - fee_per_input for utxo in selected_utxos)
+    if selected_value < target:
+        return selected_utxos
+
+    max_inputs = len(selected_utxos)
+    return (
+        branch_and_bound(utxos, target, fee_per_input=fee_per_input, tolerance=tolerance,
+                         max_inputs=max_inputs, type=type)
+        or selected_utxos
+    )
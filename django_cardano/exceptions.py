@@ -1,6 +1,8 @@
 import subprocess
 from enum import Enum
 
+from django.utils.functional import cached_property
+
 class CardanoErrorType(Enum):
     SIGNING_KEY_DECRYPTION_FAILURE = -2
     POLICY_SIGNING_KEY_DECRYPTION_FAILURE = -4
@@ -9,19 +11,39 @@ class CardanoErrorType(Enum):
 class CardanoError(Exception):
     def __init__(self, reason=None, source_error=None, code=-1):
         self.code = code
-        self.reason = reason
-
-        if source_error and not reason:
-            self.reason = str(source_error)
+        self._reason = reason
+        self._source_error = source_error
 
         if isinstance(source_error, subprocess.CalledProcessError):
-            cmd = source_error.cmd
-            if isinstance(cmd, list):
-                cmd = ' '.join(source_error.cmd)
-            self.cmd = cmd
             self.process_error = source_error
             self.code = source_error.returncode
-            self.reason = str(source_error.stderr)
+
+    # The reason and command are only rendered when inspected, as callers
+    # frequently catch a CardanoError without looking any further into it.
+    @cached_property
+    def reason(self):
+        source_error = self._source_error
+        if isinstance(source_error, subprocess.CalledProcessError):
+            stderr = source_error.stderr
+            if isinstance(stderr, bytes):
+                stderr = stderr.decode('utf-8', errors='replace')
+            return str(stderr)
+
+        if source_error and not self._reason:
+            return str(source_error)
+
+        return self._reason
+
+    @cached_property
+    def cmd(self):
+        source_error = self._source_error
+        if not isinstance(source_error, subprocess.CalledProcessError):
+            raise AttributeError('cmd')
+
+        cmd = source_error.cmd
+        if isinstance(cmd, list):
+            cmd = ' '.join(map(str, cmd))
+        return cmd
 
 
     def __str__(self) -> str:
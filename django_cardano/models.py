@@ -1,10 +1,12 @@
 import io
 import json
+import os
 import pyAesCrypt
 import tempfile
 import uuid
 
-from collections import defaultdict
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
@@ -15,19 +17,16 @@ from django.core.exceptions import ImproperlyConfigured
 from django.core.files.base import ContentFile
 from django.utils.text import slugify
 
-from .cli import (
-    CardanoCLI,
-    ASSET_COUNT_RE,
-    MIN_FEE_RE,
-    UTXO_RE,
-)
+from .cli import CardanoCLI
+from .coin_selection import select_utxos
 
 from .fields import CardanoAddressField
 from .exceptions import CardanoError, CardanoErrorType
-from .util import CardanoUtils
+from .util import CardanoUtils, TX_INPUT_SIZE, json_dumps, json_loads
 
 from .shortcuts import (
     filter_utxos,
+    partition_utxos,
     sort_utxos,
 )
 from .storage import CardanoDataStorage
@@ -77,6 +76,48 @@ def get_wallet_model():
 
 
 # ------------------------------------------------------------------------------
+def encrypt_key(key_envelope: dict, password) -> io.BytesIO:
+    """
+    :param key_envelope: Key, as a cardano-cli text envelope
+    :param password: Password with which to encrypt the key
+    :return: The key file (as written by cardano-cli), AES-encrypted
+    """
+    f_ciph = io.BytesIO()
+    # (Formatted as cardano-cli would, hence the stdlib json module)
+    key_data = json.dumps(key_envelope, indent=4).encode()
+    pyAesCrypt.encryptStream(io.BytesIO(key_data), f_ciph, password, ENCRYPTION_BUFFER_SIZE)
+    return f_ciph
+
+
+def decrypt_key(encrypted_key_path, password, file_path: Path) -> tuple:
+    """
+    Decrypt a key file into an anonymous, memory-backed file where the platform
+    supports it (Linux), so that the decrypted key is never written to any file
+    system; otherwise into the given file.
+
+    :return: Path from which cardano-cli may read the decrypted key, along with
+             the descriptor it must inherit to do so (None for an ordinary file)
+    """
+    if not hasattr(os, 'memfd_create'):
+        pyAesCrypt.decryptFile(str(encrypted_key_path), str(file_path), password, ENCRYPTION_BUFFER_SIZE)
+        return file_path, None
+
+    f_plain = io.BytesIO()
+    with open(encrypted_key_path, 'rb') as f_ciph:
+        pyAesCrypt.decryptStream(
+            f_ciph, f_plain, password, ENCRYPTION_BUFFER_SIZE, os.path.getsize(encrypted_key_path)
+        )
+
+    key_fd = os.memfd_create(file_path.name, os.MFD_CLOEXEC)
+    try:
+        with open(key_fd, 'wb', closefd=False) as key_file:
+            key_file.write(f_plain.getbuffer())
+    except OSError:
+        os.close(key_fd)
+        raise
+    return Path(f'/dev/fd/{key_fd}'), key_fd
+
+
 def file_upload_path(instance, filename):
     model_name = slugify(instance._meta.verbose_name)
     return Path(model_name, str(instance.id), filename)
@@ -86,59 +127,45 @@ class MintingPolicyManager(models.Manager):
     def create(self, password, invalid_before=None, invalid_hereafter=None, **kwargs):
         policy = self.model(**kwargs)
 
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            intermediate_file_path = Path(tmpdirname)
-
-            # 1. Create signing/verification keys for the minting policy
-            signing_key_path = intermediate_file_path / 'signing.key'
-            verification_key_path = intermediate_file_path / 'verification.key'
-            CardanoCLI.run('address key-gen', **{
-                'signing-key-file': signing_key_path,
-                'verification-key-file': verification_key_path,
-            })
-
-            # 2. Encrypt the generated key files and attach them to the Policy record
-            for field_name, file_path in {
-                'signing_key': signing_key_path,
-                'verification_key': verification_key_path,
-            }.items():
-                with open(file_path, 'rb') as fp:
-                    filename = file_path.name
-                    f_ciph = io.BytesIO()
-                    pyAesCrypt.encryptStream(io.BytesIO(fp.read()), f_ciph, password, ENCRYPTION_BUFFER_SIZE)
-                    file_field = getattr(policy, field_name)
-                    file_field.save(f'{filename}.aes', f_ciph, save=False)
-
-            policy_key_hash = CardanoCLI.run('address key-hash', **{
-                'payment-verification-key-file': verification_key_path,
+        # 1. Create signing/verification keys for the minting policy
+        # (in-process, sparing the cardano-cli invocations otherwise required
+        # to generate the keys, hash the verification key and the policy script)
+        signing_key, verification_key = CardanoUtils.generate_key_pair()
+
+        # 2. Encrypt the generated keys and attach them to the Policy record
+        for field_name, filename, key_envelope in (
+            ('signing_key', 'signing.key', signing_key),
+            ('verification_key', 'verification.key', verification_key),
+        ):
+            file_field = getattr(policy, field_name)
+            file_field.save(f'{filename}.aes', encrypt_key(key_envelope, password), save=False)
+
+        policy_key_hash = CardanoUtils.verification_key_hash(verification_key)
+
+        # 3. Construct the policy script and attach to the Policy record
+        scripts = [{
+            'keyHash': policy_key_hash,
+            'type': 'sig',
+        }]
+        if invalid_before:
+            scripts.append({
+                'type': 'after',
+                'slot': invalid_before,
             })
-
-            # 3. Construct the policy script and attach to the Policy record
-            scripts = [{
-                'keyHash': policy_key_hash,
-                'type': 'sig',
-            }]
-            if invalid_before:
-                scripts.append({
-                    'type': 'after',
-                    'slot': invalid_before,
-                })
-            if invalid_hereafter:
-                scripts.append({
-                    'type': 'before',
-                    'slot': invalid_hereafter,
-                })
-            policy_script_data = json.dumps({
-                'type': 'all',
-                'scripts': scripts
+        if invalid_hereafter:
+            scripts.append({
+                'type': 'before',
+                'slot': invalid_hereafter,
             })
-            with ContentFile(policy_script_data) as file_content:
-                policy.script.save('policy.script.json', file_content, save=False)
+        policy_script = {
+            'type': 'all',
+            'scripts': scripts
+        }
+        with ContentFile(json_dumps(policy_script)) as file_content:
+            policy.script.save('policy.script.json', file_content, save=False)
 
-            # 4. Determine the policy ID (i.e. compute hash of the policy script)
-            policy.policy_id = CardanoCLI.run('transaction policyid', **{
-                'script-file': policy.script.path
-            })
+        # 4. Determine the policy ID (i.e. compute hash of the policy script)
+        policy.policy_id = CardanoUtils.native_script_hash(policy_script)
 
         policy.save(force_insert=True, using=self.db)
         return policy
@@ -179,8 +206,7 @@ class AbstractMintingPolicy(models.Model):
         if not self.script:
             return None
 
-        with open(self.script.path, 'r') as script_file_path:
-            return json.load(script_file_path)
+        return json_loads(Path(self.script.path).read_bytes())
 
 
 class MintingPolicy(AbstractMintingPolicy):
@@ -221,7 +247,8 @@ class AbstractTransaction(models.Model):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self.temp_directory = tempfile.TemporaryDirectory()
+        self.temp_directory = tempfile.TemporaryDirectory(dir=cardano_settings.INTERMEDIATE_FILE_PATH)
+        self._intermediate_file_path = Path(self.temp_directory.name)
 
     def __del__(self):
         self.temp_directory.cleanup()
@@ -231,7 +258,7 @@ class AbstractTransaction(models.Model):
 
     @property
     def intermediate_file_path(self) -> Path:
-        return Path(self.temp_directory.name)
+        return self._intermediate_file_path
 
     @property
     def metadata_file_path(self) -> Path:
@@ -241,6 +268,22 @@ class AbstractTransaction(models.Model):
     def draft_tx_file_path(self) -> Path:
         return self.intermediate_file_path / 'transaction.draft'
 
+    @property
+    def raw_tx_file_path(self) -> Path:
+        return self.intermediate_file_path / 'transaction.raw'
+
+    @property
+    def signed_tx_file_path(self) -> Path:
+        return self.intermediate_file_path / 'transaction.signed'
+
+    @property
+    def signing_key_file_path(self) -> Path:
+        return self.intermediate_file_path / 'signing.key'
+
+    @property
+    def policy_signing_key_file_path(self) -> Path:
+        return self.intermediate_file_path / 'policy-signing.key'
+
     @property
     def tx_info(self) -> Optional[dict]:
         return CardanoUtils.tx_info(self.tx_file.path) if self.tx_file else None
@@ -262,8 +305,7 @@ class AbstractTransaction(models.Model):
             'out-file': self.draft_tx_file_path,
         }
         if self.metadata:
-            with open(self.metadata_file_path, 'w') as metadata_file:
-                json.dump(self.metadata, metadata_file)
+            self.metadata_file_path.write_bytes(json_dumps(self.metadata))
             cmd_kwargs.update({
                 'json-metadata-no-schema': None,
                 'metadata-json-file': self.metadata_file_path,
@@ -271,7 +313,7 @@ class AbstractTransaction(models.Model):
         if self.minting_policy:
             cmd_kwargs['mint-script-file'] = str(self.minting_policy.script.path)
 
-        CardanoCLI.run('transaction build-raw', *self.tx_args, **cmd_kwargs)
+        CardanoCLI.run('transaction build-raw', *self.inputs, *self.outputs, **cmd_kwargs)
 
     def calculate_min_fee(self) -> int:
         tx_body_file_path = Path(self.draft_tx_file_path)
@@ -289,81 +331,93 @@ class AbstractTransaction(models.Model):
             'protocol-params-file': CardanoUtils.protocol_parameters_path,
             'network': cardano_settings.NETWORK,
         })
-        match = MIN_FEE_RE.match(raw_response)
-        return int(match[1])
+        # The output is of the exact form: '<int> Lovelace'
+        return int(raw_response.split(' ', 1)[0])
 
     def submit(self, wallet, fee, password, invalid_hereafter=None, **tx_kwargs):
-        raw_tx_file_path = self.intermediate_file_path / 'transaction.raw'
-        signed_tx_file_path = self.intermediate_file_path / 'transaction.signed'
-        signing_key_file_path = self.intermediate_file_path / 'signing.key'
-        policy_signing_key_file_path = self.intermediate_file_path / 'policy-signing.key'
-
-        # Determine the TTL (time to Live) for the transaction
-        # https://docs.cardano.org/projects/cardano-node/en/latest/stake-pool-operations/simple_transaction.html#determine-the-ttl-time-to-live-for-the-transaction
-        if not invalid_hereafter:
-            current_slot = int(CardanoUtils.query_tip()['slot'])
-            invalid_hereafter = current_slot + cardano_settings.DEFAULT_TRANSACTION_TTL
-
-        cmd_kwargs = {
-            **tx_kwargs,
-            'fee': fee,
-            'invalid-hereafter': invalid_hereafter,
-            'out-file': raw_tx_file_path,
-        }
-
-        if self.metadata:
-            cmd_kwargs.update({
-                'json-metadata-no-schema': None,
-                'metadata-json-file': self.metadata_file_path,
-            })
+        raw_tx_file_path = self.raw_tx_file_path
+        signed_tx_file_path = self.signed_tx_file_path
+        signing_key_file_path = self.signing_key_file_path
+        policy_signing_key_file_path = self.policy_signing_key_file_path
 
-        if self.minting_policy:
-            cmd_kwargs['mint-script-file'] = str(self.minting_policy.script.path)
+        # Descriptors of the (in-memory) decrypted signing keys, if any
+        key_fds = []
+        try:
+            signing_args = []
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                # Determine the TTL (time to Live) for the transaction
+                # https://docs.cardano.org/projects/cardano-node/en/latest/stake-pool-operations/simple_transaction.html#determine-the-ttl-time-to-live-for-the-transaction
+                # The chain tip is queried while the signing keys are being decrypted.
+                ttl_future = None
+                if not invalid_hereafter:
+                    ttl_future = executor.submit(CardanoUtils.default_invalid_hereafter)
+
+                # Decrypt this wallet's signing key
+                try:
+                    signing_key_file_path, key_fd = decrypt_key(
+                        wallet.payment_signing_key.path,
+                        password,
+                        signing_key_file_path
+                    )
+                except ValueError as e:
+                    raise CardanoError(
+                        source_error=e,
+                        code=CardanoErrorType.SIGNING_KEY_DECRYPTION_FAILURE
+                    )
+                if key_fd is not None:
+                    key_fds.append(key_fd)
+
+                if self.minting_policy and self.minting_password:
+                    # Decrypt the policy signing key
+                    try:
+                        policy_signing_key_file_path, key_fd = decrypt_key(
+                            self.minting_policy.signing_key.path,
+                            self.minting_password,
+                            policy_signing_key_file_path
+                        )
+                        signing_args.append(('signing-key-file', policy_signing_key_file_path))
+                    except ValueError as e:
+                        raise CardanoError(
+                            source_error=e,
+                            code=CardanoErrorType.POLICY_SIGNING_KEY_DECRYPTION_FAILURE,
+                        )
+                    if key_fd is not None:
+                        key_fds.append(key_fd)
+
+                if ttl_future:
+                    invalid_hereafter = ttl_future.result()
+
+            cmd_kwargs = {
+                **tx_kwargs,
+                'fee': fee,
+                'invalid-hereafter': invalid_hereafter,
+                'out-file': raw_tx_file_path,
+            }
+
+            if self.metadata:
+                cmd_kwargs.update({
+                    'json-metadata-no-schema': None,
+                    'metadata-json-file': self.metadata_file_path,
+                })
 
-        CardanoCLI.run('transaction build-raw', *self.tx_args, **cmd_kwargs)
+            if self.minting_policy:
+                cmd_kwargs['mint-script-file'] = str(self.minting_policy.script.path)
 
-        # Sign the transaction
-        # https://docs.cardano.org/projects/cardano-node/en/latest/stake-pool-operations/simple_transaction.html#sign-the-transaction
-        signing_args = []
-        signing_kwargs = {
-            'signing-key-file': signing_key_file_path,
-            'tx-body-file': raw_tx_file_path,
-            'out-file': signed_tx_file_path,
-            'network': cardano_settings.NETWORK
-        }
+            CardanoCLI.run('transaction build-raw', *self.inputs, *self.outputs, **cmd_kwargs)
 
-        # Decrypt this wallet's signing key and store it as a temporary file
-        try:
-            pyAesCrypt.decryptFile(
-                wallet.payment_signing_key.path,
-                signing_key_file_path,
-                password,
-                ENCRYPTION_BUFFER_SIZE
-            )
-        except ValueError as e:
-            raise CardanoError(
-                source_error=e,
-                code=CardanoErrorType.SIGNING_KEY_DECRYPTION_FAILURE
-            )
+            # Sign the transaction
+            # https://docs.cardano.org/projects/cardano-node/en/latest/stake-pool-operations/simple_transaction.html#sign-the-transaction
+            signing_kwargs = {
+                'signing-key-file': signing_key_file_path,
+                'tx-body-file': raw_tx_file_path,
+                'out-file': signed_tx_file_path,
+                'network': cardano_settings.NETWORK
+            }
 
-        if self.minting_policy and self.minting_password:
-            # Decrypt the policy signing key and store it as a temporary file
-            try:
-                pyAesCrypt.decryptFile(
-                    self.minting_policy.signing_key.path,
-                    policy_signing_key_file_path,
-                    self.minting_password,
-                    ENCRYPTION_BUFFER_SIZE
-                )
-                signing_args.append(('signing-key-file', policy_signing_key_file_path))
-            except ValueError as e:
-                raise CardanoError(
-                    source_error=e,
-                    code=CardanoErrorType.POLICY_SIGNING_KEY_DECRYPTION_FAILURE,
-                )
-
-        # Sign the transaction
-        CardanoCLI.run('transaction sign', *signing_args, **signing_kwargs)
+            CardanoCLI.run('transaction sign', *signing_args, pass_fds=tuple(key_fds), **signing_kwargs)
+        finally:
+            for key_fd in key_fds:
+                os.close(key_fd)
 
         self.tx_id = CardanoCLI.run('transaction txid', **{
             'tx-file': signed_tx_file_path
@@ -421,51 +475,26 @@ class WalletManager(models.Manager):
     def create(self, password, **kwargs):
         wallet = self.model(**kwargs)
 
-        with tempfile.TemporaryDirectory() as tmp_path:
-            intermediate_file_path = Path(tmp_path)
-
-            # Generate the payment signing & verification keys
-            signing_key_path = intermediate_file_path / 'signing.key'
-            verification_key_path = intermediate_file_path / 'verification.key'
-            CardanoCLI.run('address key-gen', **{
-                'signing-key-file': signing_key_path,
-                'verification-key-file': verification_key_path,
-            })
-
-            # Generate the stake signing & verification keys
-            stake_signing_key_path = intermediate_file_path / 'stake-signing.key'
-            stake_verification_key_path = intermediate_file_path / 'stake-verification.key'
-            CardanoCLI.run('stake-address key-gen', **{
-                'signing-key-file': stake_signing_key_path,
-                'verification-key-file': stake_verification_key_path,
-            })
+        # Generate the payment & stake signing/verification keys
+        # (in-process, so that no key material need be written to disk)
+        signing_key, verification_key = CardanoUtils.generate_key_pair()
+        stake_signing_key, stake_verification_key = CardanoUtils.generate_key_pair(key_type='Stake')
 
-            # Create the payment address.
-            wallet.payment_address = CardanoCLI.run('address build', **{
-                'payment-verification-key-file': verification_key_path,
-                'stake-verification-key-file': stake_verification_key_path,
-                'network': cardano_settings.NETWORK,
-            })
+        # Create the payment address.
+        wallet.payment_address = CardanoUtils.build_address(verification_key, stake_verification_key)
 
-            # Create the staking address.
-            wallet.stake_address = CardanoCLI.run('stake-address build', **{
-                'stake-verification-key-file': stake_verification_key_path,
-                'network': cardano_settings.NETWORK,
-            })
+        # Create the staking address.
+        wallet.stake_address = CardanoUtils.build_stake_address(stake_verification_key)
 
-            # Encrypt the generated key files and attach them to the wallet
-            for field_name, file_path in {
-                'payment_signing_key': signing_key_path,
-                'payment_verification_key': verification_key_path,
-                'stake_signing_key': stake_signing_key_path,
-                'stake_verification_key': stake_verification_key_path,
-            }.items():
-                with open(file_path, 'rb') as fp:
-                    filename = file_path.name
-                    f_ciph = io.BytesIO()
-                    pyAesCrypt.encryptStream(io.BytesIO(fp.read()), f_ciph, password, ENCRYPTION_BUFFER_SIZE)
-                    file_field = getattr(wallet, field_name)
-                    file_field.save(f'{filename}.aes', f_ciph, save=False)
+        # Encrypt the generated keys and attach them to the wallet
+        for field_name, filename, key_envelope in (
+            ('payment_signing_key', 'signing.key', signing_key),
+            ('payment_verification_key', 'verification.key', verification_key),
+            ('stake_signing_key', 'stake-signing.key', stake_signing_key),
+            ('stake_verification_key', 'stake-verification.key', stake_verification_key),
+        ):
+            file_field = getattr(wallet, field_name)
+            file_field.save(f'{filename}.aes', encrypt_key(key_envelope, password), save=False)
 
         wallet.save(force_insert=True, using=self.db)
         return wallet
@@ -523,47 +552,71 @@ class AbstractWallet(models.Model):
     @property
     def balance(self) -> tuple:
         utxos = self.utxos
-        all_tokens = defaultdict(int)
+        all_tokens = Counter()
 
         for utxo in utxos:
-            utxo_tokens = utxo['Tokens']
-            for token_id, token_count in utxo_tokens.items():
-                all_tokens[token_id] += token_count
+            all_tokens.update(utxo['Tokens'])
 
         return all_tokens, utxos
 
     def send_lovelace(self, quantity, to_address, password=None) -> AbstractTransaction:
+        return self.send_lovelace_batch([(to_address, quantity)], password=password)
+
+    def send_lovelace_batch(self, payments, password=None) -> AbstractTransaction:
+        """
+        Send lovelace to any number of recipients by way of a single transaction
+        (and so for a single fee, rather than one per recipient).
+        :param payments: Sequence of (to_address, quantity) pairs
+        :param password: Password required to decrypt wallet signing key
+        """
+        quantity = sum(payment_quantity for _, payment_quantity in payments)
+
+        # The protocol parameters, this wallet's UTxOs and (if the transaction
+        # is to be submitted) the chain tip are independent node queries,
+        # so let them be issued concurrently.
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            protocol_parameters_future = executor.submit(CardanoUtils.refresh_protocol_parameters)
+            utxos_future = executor.submit(CardanoUtils.query_utxos, self.payment_address)
+            ttl_future = executor.submit(CardanoUtils.default_invalid_hereafter) if password else None
+
         # The protocol's declared txFeeFixed will give us a fair estimate
-        # of how much the fee for this transaction will be.
-        protocol_parameters = CardanoUtils.refresh_protocol_parameters()
+        # of how much the fee for this transaction will be, to which each
+        # input adds in proportion to its size.
+        protocol_parameters = protocol_parameters_future.result()
         estimated_tx_fee = protocol_parameters.get('txFeeFixed')
+        fee_per_input = protocol_parameters.get('txFeePerByte') * TX_INPUT_SIZE
 
         transaction_class = get_transaction_model()
         transaction = transaction_class(tx_type=TransactionTypes.LOVELACE_TRANSFER)
 
         # Get the transaction hash and index of the UTxO(s) to spend
         # https://docs.cardano.org/projects/cardano-node/en/latest/stake-pool-operations/simple_transaction.html#get-the-transaction-hash-and-index-of-the-utxo-to-spend
-        sorted_lovelace_utxos = sort_utxos(self.lovelace_utxos)
+        # The selected UTxOs must cover the lovelace being transferred and
+        # the estimated tx_fee, leaving change of at least the minimum UTxO
+        # value. Any excess on top of that is merely returned as change,
+        # so tolerate up to another minimum UTxO value's worth of it.
+        min_utxo_value = cardano_settings.MIN_UTXO_VALUE
+        selected_utxos = select_utxos(
+            filter_utxos(utxos_future.result(), include=lovelace_unit),
+            quantity + estimated_tx_fee + min_utxo_value,
+            fee_per_input=fee_per_input,
+            tolerance=min_utxo_value,
+        )
 
         total_lovelace_being_sent = 0
-        for utxo in sorted_lovelace_utxos:
+        for utxo in selected_utxos:
             tx_hash = utxo['TxHash']
             tx_index = utxo['TxIx']
             transaction.inputs.append(('tx-in', f'{tx_hash}#{tx_index}'))
             total_lovelace_being_sent += utxo['Tokens'][lovelace_unit]
 
-            # Validate whether the included UTxOs are sufficient to cover
-            # the lovelace being transferred, including the estimated tx_fee.
-            if total_lovelace_being_sent >= quantity + estimated_tx_fee:
-                break
-
-        # There will ALWAYS be exactly two output transactions:
-        #   - The funds being sent to the recipient
-        #   - The "change" being returned to the sender
+        # There will ALWAYS be one output per recipient, followed by
+        # the "change" being returned to the sender.
         transaction.outputs = [
-            ('tx-out', f'{to_address}+{quantity}'),
-            ('tx-out', f'{self.payment_address}+{total_lovelace_being_sent}'),
+            ('tx-out', f'{to_address}+{payment_quantity}')
+            for to_address, payment_quantity in payments
         ]
+        transaction.outputs.append(('tx-out', f'{self.payment_address}+{total_lovelace_being_sent}'))
 
         # Draft the transaction:
         # Produce a draft transaction in order to determine the fees required to perform the actual transaction
@@ -584,17 +637,31 @@ class AbstractWallet(models.Model):
             transaction.outputs[-1] = ('tx-out', f'{self.payment_address}+{lovelace_to_return}')
 
             # Let successful transactions be persisted to the database
-            transaction.submit(wallet=self, fee=tx_fee, password=password)
+            transaction.submit(
+                wallet=self,
+                fee=tx_fee,
+                password=password,
+                invalid_hereafter=ttl_future.result()
+            )
             transaction.save()
 
         return transaction
 
     def send_tokens(self, asset_id, quantity, to_address, password=None) -> AbstractTransaction:
-        utxos = self.utxos
-        sorted_lovelace_utxos = sort_utxos(self.lovelace_utxos)
-        token_utxos = sort_utxos(filter_utxos(utxos, include=asset_id), type=asset_id)
-
-        if not sorted_lovelace_utxos:
+        # If the transaction is to be submitted, let the chain tip and the
+        # protocol parameters (see: calculate_min_fee) be queried concurrently
+        # with this wallet's UTxOs.
+        ttl_future = None
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            if password:
+                ttl_future = executor.submit(CardanoUtils.default_invalid_hereafter)
+                executor.submit(CardanoUtils.refresh_protocol_parameters)
+            utxos = partition_utxos(self.utxos, lovelace_unit, asset_id)
+
+        lovelace_utxos = utxos[lovelace_unit]
+        token_utxos = sort_utxos(utxos[asset_id], type=asset_id)
+
+        if not lovelace_utxos:
             # Let there be be at least one UTxO containing purely ADA.
             # This will be used to pay for the transaction.
             raise CardanoError('Insufficient ADA funds to complete transaction')
@@ -604,7 +671,7 @@ class AbstractWallet(models.Model):
 
         # ASSUMPTION: The largest ADA UTxO shall contain sufficient ADA
         # to pay for the transaction (including fees)
-        lovelace_utxo = sorted_lovelace_utxos[0]
+        lovelace_utxo = max(lovelace_utxos, key=lambda utxo: utxo['Tokens'][lovelace_unit])
         total_lovelace_being_sent = lovelace_utxo['Tokens'][lovelace_unit]
         transaction.inputs = [('tx-in', '{}#{}'.format(lovelace_utxo['TxHash'], lovelace_utxo['TxIx']))]
 
@@ -618,7 +685,7 @@ class AbstractWallet(models.Model):
             total_tokens_being_sent += utxo['Tokens'][asset_id]
 
             # Accumulate the total amount of lovelace being sent
-            total_lovelace_being_sent += utxo['Tokens'][lovelace_unit]
+            total_lovelace_being_sent += utxo['Tokens'].get(lovelace_unit, 0)
 
             if total_tokens_being_sent >= quantity:
                 break
@@ -631,7 +698,7 @@ class AbstractWallet(models.Model):
         # Let the first transaction output represent the tokens being sent to the recipient
         token_bundle = f'"{quantity} {asset_id}"'
         token_dust = CardanoUtils.min_token_dust_value(token_bundle)
-        transaction.outputs = [('tx-out', f'{to_address}+{token_dust}+{token_bundle}')]
+        transaction.outputs = [('tx-out', f'{to_address}+{token_dust}+{quantity} {asset_id}')]
         lovelace_to_return -= token_dust
 
         # If there are more tokens in this wallet than are being sent, return the rest to the sender
@@ -639,7 +706,7 @@ class AbstractWallet(models.Model):
         if tokens_to_return > 0:
             token_bundle = f'"{tokens_to_return} {asset_id}"'
             token_dust = CardanoUtils.min_token_dust_value(token_bundle)
-            transaction.outputs.append(('tx-out', f'{self.payment_address}+{token_dust}+{token_bundle}'))
+            transaction.outputs.append(('tx-out', f'{self.payment_address}+{token_dust}+{tokens_to_return} {asset_id}'))
             lovelace_to_return -= token_dust
 
         # The last output represents the lovelace being returned to the payment wallet
@@ -660,7 +727,12 @@ class AbstractWallet(models.Model):
             # https://docs.cardano.org/projects/cardano-node/en/latest/stake-pool-operations/simple_transaction.html#calculate-the-change-to-send-back-to-payment-addr
             transaction.outputs[-1] = ('tx-out', f'{self.payment_address}+{lovelace_to_return - tx_fee}')
 
-            transaction.submit(wallet=self, fee=tx_fee, password=password)
+            transaction.submit(
+                wallet=self,
+                fee=tx_fee,
+                password=password,
+                invalid_hereafter=ttl_future.result()
+            )
 
             # Let successful transactions be persisted to the database
             transaction.save()
@@ -668,7 +740,11 @@ class AbstractWallet(models.Model):
         return transaction
 
     def consolidate_utxos(self, password=None) -> AbstractTransaction:
-        all_tokens, utxos = self.balance
+        # Query the chain tip (if the transaction is to be submitted)
+        # concurrently with this wallet's UTxOs.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            ttl_future = executor.submit(CardanoUtils.default_invalid_hereafter) if password else None
+            all_tokens, utxos = self.balance
 
         transaction_model_class = get_transaction_model()
         transaction = transaction_model_class(tx_type=TransactionTypes.TOKEN_CONSOLIDATION)
@@ -688,7 +764,7 @@ class AbstractWallet(models.Model):
             # with respect to that token's properties
             token_bundle = f'"{asset_count} {asset_id}"'
             token_dust = CardanoUtils.min_token_dust_value(token_bundle)
-            transaction.outputs.append(('tx-out', f'{self.payment_address}+{token_dust}+{token_bundle}'))
+            transaction.outputs.append(('tx-out', f'{self.payment_address}+{token_dust}+{asset_count} {asset_id}'))
             remaining_lovelace -= token_dust
 
         # This output represents the remaining ADA.
@@ -712,7 +788,12 @@ class AbstractWallet(models.Model):
             # https://docs.cardano.org/projects/cardano-node/en/latest/stake-pool-operations/simple_transaction.html#calculate-the-change-to-send-back-to-payment-addr
             transaction.outputs[-1] = ('tx-out', f'{self.payment_address}+{remaining_lovelace - tx_fee}')
 
-            transaction.submit(wallet=self, fee=tx_fee, password=password)
+            transaction.submit(
+                wallet=self,
+                fee=tx_fee,
+                password=password,
+                invalid_hereafter=ttl_future.result()
+            )
 
             # Let successful transactions be persisted to the database
             transaction.save()
@@ -781,12 +862,17 @@ class AbstractWallet(models.Model):
         if not payment_utxo:
             # If a payment utxo was not explicitly provided, we will use this wallet's largest
             # UTxO with the assumption that it will cover the transaction (including fees)
-            sorted_lovelace_utxos = sort_utxos(self.lovelace_utxos)
-            if not sorted_lovelace_utxos:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                # Let the protocol parameters (see: calculate_min_fee) be
+                # refreshed concurrently with the query of this wallet's UTxOs.
+                if spending_password is not None and minting_password is not None:
+                    executor.submit(CardanoUtils.refresh_protocol_parameters)
+                lovelace_utxos = self.lovelace_utxos
+            if not lovelace_utxos:
                 # Let there be be at least one UTxO containing purely ADA.
                 # This will be used to pay for the transaction.
                 raise CardanoError(f'Inadequate funds to complete transaction')
-            payment_utxo = sorted_lovelace_utxos[0]
+            payment_utxo = max(lovelace_utxos, key=lambda utxo: utxo['Tokens'][lovelace_unit])
 
         # Specify the asset ID and quantity of tokens to mint
         # https://docs.cardano.org/en/latest/native-tokens/getting-started-with-native-tokens.html#syntax-of-multi-asset-values
@@ -794,7 +880,8 @@ class AbstractWallet(models.Model):
         if asset_name:
             asset_hex = asset_name.encode('utf-8').hex()
             asset_id = f'{asset_id}.{asset_hex}'
-        token_bundle = f'"{quantity} {asset_id}"'
+        token_value = f'{quantity} {asset_id}'
+        token_bundle = f'"{token_value}"'
 
         # Structure the token metadata according to the proposed "721" standard
         # See: https://www.reddit.com/r/CardanoDevelopers/comments/mkhlv8/nft_metadata_standard/
@@ -814,14 +901,14 @@ class AbstractWallet(models.Model):
 
         transaction.inputs = [('tx-in', '{}#{}'.format(payment_utxo['TxHash'], payment_utxo['TxIx']))]
         transaction.outputs = [
-            ('tx-out', f'{to_address}+{token_dust}+{token_bundle}'),
+            ('tx-out', f'{to_address}+{token_dust}+{token_value}'),
             ('tx-out', f'{surplus_address}+{lovelace_to_return}')
         ]
 
         # Draft the transaction:
         # Produce a draft transaction in order to determine the fees required to perform the actual transaction
         # https://docs.cardano.org/projects/cardano-node/en/latest/stake-pool-operations/simple_transaction.html#draft-the-transaction
-        transaction.generate_draft(mint=token_bundle)
+        transaction.generate_draft(mint=token_value)
 
         if spending_password is not None and minting_password is not None:
             # Calculate the fee
@@ -843,7 +930,7 @@ class AbstractWallet(models.Model):
                 wallet=self,
                 fee=tx_fee,
                 password=spending_password,
-                mint=token_bundle,
+                mint=token_value,
                 invalid_hereafter=invalid_hereafter
             )
 
@@ -6,14 +6,26 @@ from django.utils.module_loading import import_string
 
 USER_SETTINGS = getattr(settings, 'DJANGO_CARDANO', None)
 
+# Shared memory (tmpfs), where available, spares intermediate files any disk I/O
+SHARED_MEMORY_PATH = '/dev/shm'
+
 DEFAULTS = {
     'APP_DATA_PATH': os.environ.get('CARDANO_APP_DATA_PATH'),
     'CLI_PATH': os.environ.get('CARDANO_CLI_PATH'),
+    # Maximum number of cardano-cli processes to run at once (per Django process); unbounded if None
+    'CLI_MAX_CONCURRENCY': None,
     'DEFAULT_TRANSACTION_TTL': 1000,
+    # Directory in which transaction files and (decrypted) keys are written
+    # while in use; shared memory if available, otherwise the system default
+    'INTERMEDIATE_FILE_PATH': os.environ.get('CARDANO_INTERMEDIATE_FILE_PATH') or (
+        SHARED_MEMORY_PATH if os.access(SHARED_MEMORY_PATH, os.W_OK) else None
+    ),
     'LOVELACE_UNIT': 'lovelace',
     'NETWORK': 'mainnet',
     'NODE_SOCKET_PATH': os.environ.get('CARDANO_NODE_SOCKET_PATH'),
     'PROTOCOL_TTL': 3600,
+    # Number of seconds for which the chain tip may be cached (0 to disable)
+    'TIP_CACHE_TIMEOUT': 1,
     # Magic numbers
     'TESTNET_MAGIC': 1097911063,
     'COIN_SIZE': 0,
@@ -124,12 +136,12 @@ django_cardano_settings = DjangoCardanoSettings(USER_SETTINGS, DEFAULTS, IMPORT_
 
 # -----------------------------------------------------------------------------
 def reload_settings(*args, **kwargs):  # pragma: no cover
-    global django_cardano_settings
-
-    setting, value = kwargs['setting'], kwargs['value']
+    setting = kwargs['setting']
 
+    # Reload the existing instance (rather than binding a new one) so that
+    # modules which imported django_cardano_settings see the new values.
     if setting == 'DJANGO_CARDANO':
-        django_cardano_settings = DjangoCardanoSettings(value, DEFAULTS, IMPORT_STRINGS)
+        django_cardano_settings.reload()
 
 
 setting_changed.connect(reload_settings)
@@ -1,3 +1,4 @@
+import heapq
 import os
 import re
 from pathlib import Path
@@ -34,6 +35,34 @@ def filter_utxos(utxos, include=None, exclude=None) -> list:
     return filtered_utxos
 
 
+def partition_utxos(utxos, *asset_types) -> dict:
+    """
+    Group the given UTxOs by each of the given asset types in a single pass.
+    A UTxO is assigned to an asset type by the same criteria as
+    filter_utxos(utxos, include=<asset_type>), so the lovelace partition
+    consists only of UTxOs containing nothing but lovelace.
+
+    :return: Dictionary mapping each asset type to a list of UTxOs
+    """
+    partitions = {asset_type: [] for asset_type in asset_types}
+    lovelace_unit = settings.LOVELACE_UNIT
+    lovelace_utxos = partitions.get(lovelace_unit)
+
+    for utxo in utxos:
+        tokens = utxo['Tokens']
+        if len(tokens) == 1:
+            # See filter_utxos: a lone asset type MUST be lovelace.
+            if lovelace_utxos is not None:
+                lovelace_utxos.append(utxo)
+            continue
+
+        for asset_type in tokens:
+            if asset_type != lovelace_unit and asset_type in partitions:
+                partitions[asset_type].append(utxo)
+
+    return partitions
+
+
 def sort_utxos(utxos, type=settings.LOVELACE_UNIT, order='desc') -> list:
     if order == 'desc':
         return sorted(utxos, key=lambda v: v['Tokens'][type], reverse=True)
@@ -41,6 +70,19 @@ def sort_utxos(utxos, type=settings.LOVELACE_UNIT, order='desc') -> list:
         return sorted(utxos, key=lambda v: v['Tokens'][type])
 
 
+def largest_utxos(utxos, type=settings.LOVELACE_UNIT):
+    """
+    Yield the given UTxOs in descending order of their amount of the given
+    asset type. The UTxOs are ordered lazily (by way of a heap), so that a
+    consumer requiring only the first few of them need not sort them all.
+    """
+    heap = [(-utxo['Tokens'][type], index, utxo) for index, utxo in enumerate(utxos)]
+    heapq.heapify(heap)
+
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
 def clean_token_asset_name(asset_name: str) -> str:
     """
     :param asset_name: The asset_name segment of a Cardano native token
@@ -1,22 +1,40 @@
+import bech32
+import json
 import os
 import random
 import shutil
+import tempfile
 from pathlib import Path
 
 from django.conf import settings
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.text import slugify
 
+from .cli import _cli_semaphore, _network_args
+from .coin_selection import (
+    branch_and_bound,
+    largest_first,
+    select_utxos,
+)
 from .exceptions import CardanoError
 from .models import (
+    decrypt_key,
+    encrypt_key,
     get_minting_policy_model,
     get_transaction_model,
     get_wallet_model,
 )
 from .settings import django_cardano_settings
+from .shortcuts import (
+    filter_utxos,
+    largest_utxos,
+    partition_utxos,
+    sort_utxos,
+)
 from .util import (
     CardanoUtils,
     asset_id_to_fingerprint,
+    cbor_encode,
 )
 
 MintingPolicy = get_minting_policy_model()
@@ -42,6 +60,16 @@ def data_path_for_model(instance):
     return base_path / model_name / str(instance.id)
 
 
+class CardanoCLITestCase(TestCase):
+    def test_settings_reload(self):
+        with override_settings(DJANGO_CARDANO={'TESTNET_MAGIC': 42, 'CLI_MAX_CONCURRENCY': 2}):
+            self.assertEqual(django_cardano_settings.TESTNET_MAGIC, 42)
+            self.assertEqual(_network_args('testnet'), ('--testnet-magic', '42'))
+            self.assertIsNotNone(_cli_semaphore())
+
+        self.assertNotEqual(_network_args('testnet'), ('--testnet-magic', '42'))
+
+
 class CardanoUtilTestCase(TestCase):
     def test_asset_id_to_fingerprint(self):
         policy_id = '24b5f9735a77c82091dbd7381ca887da26cf45c35986038b0e6a3522'
@@ -63,6 +91,42 @@ class CardanoUtilTestCase(TestCase):
         self.assertIn('minUTxOValue', protocol_parameters)
         self.assertIn('txFeePerByte', protocol_parameters)
 
+    def test_cbor_encode(self):
+        self.assertEqual(cbor_encode(23).hex(), '17')
+        self.assertEqual(cbor_encode(1000000).hex(), '1a000f4240')
+        self.assertEqual(cbor_encode([1, [2, 3]]).hex(), '8201820203')
+        self.assertEqual(cbor_encode(bytes(32)).hex(), '5820' + '00' * 32)
+
+    def test_generate_key_pair(self):
+        signing_key, verification_key = CardanoUtils.generate_key_pair()
+        self.assertEqual(signing_key['type'], 'PaymentSigningKeyShelley_ed25519')
+        self.assertEqual(verification_key['type'], 'PaymentVerificationKeyShelley_ed25519')
+        self.assertEqual(len(verification_key['cborHex']), 68)
+
+        key_hash = CardanoUtils.verification_key_hash(verification_key)
+        self.assertEqual(len(key_hash), 56)
+
+        policy_id = CardanoUtils.native_script_hash({
+            'type': 'all',
+            'scripts': [{'type': 'sig', 'keyHash': key_hash}, {'type': 'before', 'slot': 1000}],
+        })
+        self.assertEqual(len(policy_id), 56)
+
+    def test_build_address(self):
+        _, verification_key = CardanoUtils.generate_key_pair()
+        _, stake_verification_key = CardanoUtils.generate_key_pair(key_type='Stake')
+        self.assertEqual(stake_verification_key['type'], 'StakeVerificationKeyShelley_ed25519')
+
+        payment_address = CardanoUtils.build_address(verification_key, stake_verification_key)
+        self.assertTrue(payment_address.startswith('addr'))
+
+        # Header byte, followed by the stake key hash
+        stake_address = CardanoUtils.build_stake_address(stake_verification_key)
+        hrp, data = bech32.bech32_decode(stake_address)
+        stake_address_bytes = bytes(bech32.convertbits(data, 5, 8, False))
+        self.assertTrue(hrp.startswith('stake'))
+        self.assertEqual(stake_address_bytes[1:].hex(), CardanoUtils.verification_key_hash(stake_verification_key))
+
     def test_token_bundle_info(self):
         bundle_info = CardanoUtils.token_bundle_info(DEFAULT_TOKEN_BUNDLE)
 
@@ -84,6 +148,97 @@ class CardanoUtilTestCase(TestCase):
         print('How to validate this???', min_token_dust_value)
 
 
+class KeyEncryptionTestCase(TestCase):
+    def test_encrypt_decrypt_key(self):
+        signing_key, _ = CardanoUtils.generate_key_pair()
+
+        with tempfile.TemporaryDirectory() as tmp_path:
+            encrypted_key_path = Path(tmp_path, 'signing.key.aes')
+            encrypted_key_path.write_bytes(encrypt_key(signing_key, DEFAULT_SPENDING_PASSWORD).getvalue())
+
+            key_path, key_fd = decrypt_key(encrypted_key_path, DEFAULT_SPENDING_PASSWORD, Path(tmp_path, 'signing.key'))
+            try:
+                self.assertEqual(json.loads(Path(key_path).read_bytes()), signing_key)
+            finally:
+                if key_fd is not None:
+                    os.close(key_fd)
+
+            with self.assertRaises(ValueError):
+                decrypt_key(encrypted_key_path, DEFAULT_MINTING_PASSWORD, Path(tmp_path, 'signing.key'))
+
+
+class CardanoShortcutsTestCase(TestCase):
+    asset_id = 'fe1249f6a018ccc7a620df6226d6b9b9a63555593051b79885dc2e28.TestNFT'
+    utxos = [
+        {'TxHash': 'a', 'TxIx': '0', 'Tokens': {'lovelace': 5000000}},
+        {'TxHash': 'b', 'TxIx': '0', 'Tokens': {'lovelace': 1500000, asset_id: 1}},
+        {'TxHash': 'c', 'TxIx': '1', 'Tokens': {'lovelace': 2000000}},
+    ]
+
+    def test_partition_utxos(self):
+        lovelace_unit = django_cardano_settings.LOVELACE_UNIT
+        partitions = partition_utxos(self.utxos, lovelace_unit, self.asset_id)
+
+        self.assertEqual(partitions[lovelace_unit], filter_utxos(self.utxos, include=lovelace_unit))
+        self.assertEqual(partitions[self.asset_id], filter_utxos(self.utxos, include=self.asset_id))
+
+    def test_largest_utxos(self):
+        self.assertEqual(list(largest_utxos(self.utxos)), sort_utxos(self.utxos))
+
+
+class CoinSelectionTestCase(TestCase):
+    utxos = [
+        {'TxHash': 'a', 'TxIx': '0', 'Tokens': {'lovelace': 5000000}},
+        {'TxHash': 'b', 'TxIx': '0', 'Tokens': {'lovelace': 3000000}},
+        {'TxHash': 'c', 'TxIx': '1', 'Tokens': {'lovelace': 2000000}},
+        {'TxHash': 'd', 'TxIx': '2', 'Tokens': {'lovelace': 1000000}},
+    ]
+
+    def test_branch_and_bound(self):
+        selected_utxos = branch_and_bound(self.utxos, 4000000)
+        self.assertEqual([utxo['TxHash'] for utxo in selected_utxos], ['b', 'd'])
+
+        # Spending each input costs 100000, so the pair above now falls short
+        selected_utxos = branch_and_bound(self.utxos, 4000000, fee_per_input=100000, tolerance=1000000)
+        self.assertEqual([utxo['TxHash'] for utxo in selected_utxos], ['a'])
+
+        # The exact match above takes two inputs; limited to one, the excess is tolerated instead
+        selected_utxos = branch_and_bound(self.utxos, 4000000, tolerance=1000000, max_inputs=1)
+        self.assertEqual([utxo['TxHash'] for utxo in selected_utxos], ['a'])
+
+        self.assertEqual(branch_and_bound(self.utxos, 11500000), [])
+
+    def test_largest_first(self):
+        selected_utxos = largest_first(self.utxos, 7500000)
+        self.assertEqual([utxo['TxHash'] for utxo in selected_utxos], ['a', 'b'])
+
+        # The fee incurred by each input must be covered as well
+        selected_utxos = largest_first(self.utxos, 7500000, fee_per_input=300000)
+        self.assertEqual([utxo['TxHash'] for utxo in selected_utxos], ['a', 'b', 'c'])
+
+    def test_select_utxos(self):
+        # A single input covers the target exactly
+        selected_utxos = select_utxos(self.utxos, 3000000)
+        self.assertEqual([utxo['TxHash'] for utxo in selected_utxos], ['b'])
+
+        # No single input matches exactly, so the largest one is selected
+        selected_utxos = select_utxos(self.utxos, 4500000)
+        self.assertEqual([utxo['TxHash'] for utxo in selected_utxos], ['a'])
+
+        # Insufficient funds: every UTxO is selected
+        self.assertEqual(len(select_utxos(self.utxos, 11500000)), len(self.utxos))
+
+        # Many small UTxOs never displace the one large UTxO that covers the target
+        rng = random.Random(0)
+        utxos = [
+            {'TxHash': str(index), 'TxIx': '0', 'Tokens': {'lovelace': rng.randint(1200000, 3000000)}}
+            for index in range(500)
+        ]
+        utxos.append({'TxHash': 'large', 'TxIx': '0', 'Tokens': {'lovelace': 900000000}})
+        selected_utxos = select_utxos(utxos, 300000000, fee_per_input=44 * 37, tolerance=1000000)
+        self.assertEqual([utxo['TxHash'] for utxo in selected_utxos], ['large'])
+
+
 class DjangoCardanoTestCase(TestCase):
     wallet = None
 
@@ -165,6 +320,18 @@ class DjangoCardanoTestCase(TestCase):
         self.assertFalse(transaction._state.adding)
         self.assertFalse(transaction.intermediate_file_path.exists())
 
+    def test_send_lovelace_batch(self):
+        to_address = self.wallet.payment_address
+        draft_transaction = self.wallet.send_lovelace_batch([
+            (to_address, 1000000),
+            (to_address, 2000000),
+        ])
+
+        # One output per recipient, plus the change
+        self.assertEqual(len(draft_transaction.outputs), 3)
+        self.assertEqual(draft_transaction.outputs[1], ('tx-out', f'{to_address}+2000000'))
+        draft_transaction.delete()
+
     def test_send_tokens(self):
         self.wallet.send_tokens(
             'd491fdc194c0d988459ce05a65c8a52259433e84d7162765570aa581.MMTestTokenTwo',
@@ -3,20 +3,70 @@ import json
 import math
 import os
 import re
+import tempfile
+import threading
 
-from collections import defaultdict
 from datetime import datetime, timezone
+from functools import lru_cache
 from hashlib import blake2b
 from pathlib import Path
 
-from .cli import (
-    CardanoCLI,
-    ASSET_COUNT_RE,
-    UTXO_RE,
-)
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat, PublicFormat
+from django.core.cache import cache
+from django.test.signals import setting_changed
+
+from .cli import CardanoCLI
 from .settings import django_cardano_settings as settings
 
-TOKEN_BUNDLE_RE = re.compile(r'(?:\".*?\"|\S)+')
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+TOKEN_BUNDLE_RE = re.compile(r'(?:\".*?\"|\S)+', re.ASCII)
+
+# Serialized size (in bytes) of a transaction input:
+# array header (1) + transaction hash (2 + 32) + output index (2)
+TX_INPUT_SIZE = 37
+
+
+def json_loads(data):
+    """
+    Deserialize a JSON document (str or bytes), using orjson if it is installed.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj) -> bytes:
+    """
+    Serialize an object to a JSON document (bytes), using orjson if it is installed.
+    """
+    if orjson is not None:
+        # Like json.dumps, let non-str keys (ex: the integer labels of
+        # transaction metadata) be serialized as strings.
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode()
+
+
+@lru_cache(maxsize=2048)
+def _address_info(address) -> dict:
+    """
+    The output of 'address info' is determined entirely by the address itself,
+    so it is computed (at most) once per address.
+    """
+    response = CardanoCLI.run('address info', address=address, text=False)
+    return json_loads(response)
+
+
+def clear_address_info_cache(*args, setting=None, **kwargs):
+    if setting in (None, 'DJANGO_CARDANO'):
+        _address_info.cache_clear()
+
+
+setting_changed.connect(clear_address_info_cache)
 
 
 def quot(a: int, b: int) -> int:
@@ -27,6 +77,34 @@ def roundup_bytes_to_words(b: int) -> int:
     return quot(b + 7, 8)
 
 
+def cbor_encode(value) -> bytes:
+    """
+    Minimal CBOR (RFC 8949) encoder, sufficient for native scripts and key envelopes.
+    :param value: Unsigned integer, byte string, or list/tuple thereof
+    :return: The CBOR encoding of the given value
+    """
+    if isinstance(value, int):
+        major_type, argument, payload = 0, value, b''
+    elif isinstance(value, bytes):
+        major_type, argument, payload = 2, len(value), value
+    elif isinstance(value, (list, tuple)):
+        major_type, argument = 4, len(value)
+        payload = b''.join(cbor_encode(item) for item in value)
+    else:
+        raise TypeError(f'Cannot CBOR-encode value of type {type(value).__name__}')
+
+    if argument < 24:
+        head = bytes((major_type << 5 | argument,))
+    else:
+        # The argument follows the initial byte in 1, 2, 4 or 8 bytes
+        additional_info, length = next(
+            (24 + i, 1 << i) for i in range(4) if argument < 1 << (8 << i)
+        )
+        head = bytes((major_type << 5 | additional_info,)) + argument.to_bytes(length, 'big')
+
+    return head + payload
+
+
 def asset_id_to_fingerprint(asset_id):
     """
     See: https://github.com/cardano-foundation/CIPs/tree/master/CIP-0014
@@ -43,73 +121,222 @@ def asset_id_to_fingerprint(asset_id):
 class CardanoUtils:
     protocol_parameters_path = Path(settings.APP_DATA_PATH, 'protocol.json')
 
+    # Parsed contents of the protocol parameters file, along with the
+    # modification time and digest of the file from which they were read
+    _protocol_parameters = None
+    _protocol_parameters_mtime = None
+    _protocol_parameters_digest = None
+    _protocol_parameters_lock = threading.Lock()
+
     @classmethod
     def refresh_protocol_parameters(cls, force=False) -> dict:
-        if not os.path.exists(settings.APP_DATA_PATH):
-            os.makedirs(settings.APP_DATA_PATH, 0o755)
-
-        load = True
-        if cls.protocol_parameters_path.exists():
-            if force or not settings.PROTOCOL_TTL:
-                load = True
-            else:
-                file_stats = cls.protocol_parameters_path.stat()
-                date_modified = datetime.fromtimestamp(file_stats.st_mtime, tz=timezone.utc)
-                now = datetime.now(tz=timezone.utc)
-                file_age = now - date_modified
-                load = True if file_age.seconds > settings.PROTOCOL_TTL else False
-
-        if load:
-            CardanoCLI.run('query protocol-parameters', **{
-                'network': settings.NETWORK,
-                'out-file': cls.protocol_parameters_path,
-            })
+        # Concurrent callers (ex: the worker threads of a Django process) would
+        # otherwise each query the node for the very same parameters.
+        with cls._protocol_parameters_lock:
+            os.makedirs(settings.APP_DATA_PATH, 0o755, exist_ok=True)
+
+            load = True
+            if cls.protocol_parameters_path.exists():
+                if force or not settings.PROTOCOL_TTL:
+                    load = True
+                else:
+                    file_stats = cls.protocol_parameters_path.stat()
+                    date_modified = datetime.fromtimestamp(file_stats.st_mtime, tz=timezone.utc)
+                    now = datetime.now(tz=timezone.utc)
+                    file_age = now - date_modified
+                    load = True if file_age.total_seconds() > settings.PROTOCOL_TTL else False
+
+            if load:
+                # Let the parameters be written to a temporary file that then atomically
+                # replaces the protocol parameters file, lest a failed query leave it truncated.
+                fd, tmp_file_path = tempfile.mkstemp(dir=settings.APP_DATA_PATH, suffix='.json')
+                os.close(fd)
+                try:
+                    CardanoCLI.run('query protocol-parameters', **{
+                        'network': settings.NETWORK,
+                        'out-file': tmp_file_path,
+                    })
+
+                    with open(tmp_file_path, 'rb') as tmp_file:
+                        digest = blake2b(tmp_file.read(), digest_size=16).digest()
+
+                    if digest == cls._protocol_parameters_digest and cls.protocol_parameters_path.exists():
+                        # The parameters have not changed (they only do so at epoch
+                        # boundaries); merely renew the age of the existing file.
+                        os.utime(cls.protocol_parameters_path)
+                        cls._protocol_parameters_mtime = cls.protocol_parameters_path.stat().st_mtime
+                    else:
+                        os.replace(tmp_file_path, cls.protocol_parameters_path)
+                finally:
+                    if os.path.exists(tmp_file_path):
+                        os.remove(tmp_file_path)
+
+            # Only re-parse the protocol parameters file if it has changed
+            # since it was last read.
+            mtime = cls.protocol_parameters_path.stat().st_mtime
+            if cls._protocol_parameters is None or mtime != cls._protocol_parameters_mtime:
+                protocol_parameters_raw = cls.protocol_parameters_path.read_bytes()
+                cls._protocol_parameters = json_loads(protocol_parameters_raw)
+                cls._protocol_parameters_digest = blake2b(protocol_parameters_raw, digest_size=16).digest()
+                cls._protocol_parameters_mtime = mtime
+
+            # The parameters are shared by every caller; hand out a copy
+            # so that callers cannot alter the cached parameters.
+            return dict(cls._protocol_parameters)
 
-        with open(cls.protocol_parameters_path, 'r') as protocol_parameters_file:
-            protocol_parameters = json.load(protocol_parameters_file)
+    @classmethod
+    def generate_key_pair(cls, key_type='Payment') -> tuple:
+        """
+        Generate an ed25519 key pair, as would 'address key-gen' (or 'stake-address key-gen')
+        :param key_type: 'Payment' or 'Stake'
+        :return: The signing and verification keys, as cardano-cli text envelopes
+        """
+        signing_key = Ed25519PrivateKey.generate()
+        signing_key_bytes = signing_key.private_bytes(Encoding.Raw, PrivateFormat.Raw, NoEncryption())
+        verification_key_bytes = signing_key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
 
-        return protocol_parameters
+        return {
+            'type': f'{key_type}SigningKeyShelley_ed25519',
+            'description': f'{key_type} Signing Key',
+            'cborHex': cbor_encode(signing_key_bytes).hex(),
+        }, {
+            'type': f'{key_type}VerificationKeyShelley_ed25519',
+            'description': f'{key_type} Verification Key',
+            'cborHex': cbor_encode(verification_key_bytes).hex(),
+        }
+
+    @classmethod
+    def verification_key_hash(cls, verification_key: dict) -> str:
+        """
+        Compute the hash of a verification key, as would 'address key-hash'
+        :param verification_key: Verification key text envelope
+        :return: Hexadecimal blake2b-224 digest of the key
+        """
+        # The envelope holds the key as a CBOR byte string of 32 bytes (header: 0x5820)
+        verification_key_bytes = bytes.fromhex(verification_key['cborHex'])[2:]
+        return blake2b(verification_key_bytes, digest_size=28).hexdigest()
+
+    @classmethod
+    def build_address(cls, payment_verification_key: dict, stake_verification_key: dict) -> str:
+        """
+        Build the (base) address of the given keys, as would 'address build'
+        See: https://github.com/cardano-foundation/CIPs/tree/master/CIP-0019
+        :return: bech32-encoded payment address
+        """
+        network_id = 1 if settings.NETWORK == 'mainnet' else 0
+        address_bytes = bytes((0b0000 << 4 | network_id,))
+        address_bytes += bytes.fromhex(cls.verification_key_hash(payment_verification_key))
+        address_bytes += bytes.fromhex(cls.verification_key_hash(stake_verification_key))
+
+        hrp = 'addr' if network_id else 'addr_test'
+        return bech32.bech32_encode(hrp, bech32.convertbits(address_bytes, 8, 5))
+
+    @classmethod
+    def build_stake_address(cls, stake_verification_key: dict) -> str:
+        """
+        Build the reward address of the given stake key, as would 'stake-address build'
+        :return: bech32-encoded stake address
+        """
+        network_id = 1 if settings.NETWORK == 'mainnet' else 0
+        address_bytes = bytes((0b1110 << 4 | network_id,))
+        address_bytes += bytes.fromhex(cls.verification_key_hash(stake_verification_key))
+
+        hrp = 'stake' if network_id else 'stake_test'
+        return bech32.bech32_encode(hrp, bech32.convertbits(address_bytes, 8, 5))
+
+    @classmethod
+    def native_script_hash(cls, script: dict) -> str:
+        """
+        Compute the hash of a (JSON) native script, as would 'transaction policyid'
+        :param script: Native script, ex: {'type': 'all', 'scripts': [{'type': 'sig', 'keyHash': ...}]}
+        :return: Hexadecimal blake2b-224 digest of the tagged script
+        """
+        def to_cbor_value(script):
+            script_type = script['type']
+            if script_type == 'sig':
+                return [0, bytes.fromhex(script['keyHash'])]
+            elif script_type == 'all':
+                return [1, [to_cbor_value(s) for s in script['scripts']]]
+            elif script_type == 'any':
+                return [2, [to_cbor_value(s) for s in script['scripts']]]
+            elif script_type == 'atLeast':
+                return [3, int(script['required']), [to_cbor_value(s) for s in script['scripts']]]
+            elif script_type == 'after':
+                return [4, int(script['slot'])]
+            elif script_type == 'before':
+                return [5, int(script['slot'])]
+            raise ValueError(f'Unknown native script type: {script_type}')
+
+        # Native scripts are hashed along with their language tag (0)
+        return blake2b(b'\x00' + cbor_encode(to_cbor_value(script)), digest_size=28).hexdigest()
 
     @classmethod
     def query_tip(cls) -> dict:
-        response = CardanoCLI.run('query tip', network=settings.NETWORK)
-        return json.loads(response)
+        # The tip only advances once per slot (~1s on mainnet), so let it be
+        # shared (via Django's cache) by all callers within TIP_CACHE_TIMEOUT.
+        if settings.TIP_CACHE_TIMEOUT:
+            return cache.get_or_set(
+                f'django_cardano:tip:{settings.NETWORK}',
+                cls._query_tip,
+                settings.TIP_CACHE_TIMEOUT,
+            )
+        return cls._query_tip()
+
+    @classmethod
+    def _query_tip(cls) -> dict:
+        response = CardanoCLI.run('query tip', network=settings.NETWORK, text=False)
+        return json_loads(response)
+
+    @classmethod
+    def default_invalid_hereafter(cls, tip=None) -> int:
+        """
+        https://docs.cardano.org/projects/cardano-node/en/latest/stake-pool-operations/simple_transaction.html#determine-the-ttl-time-to-live-for-the-transaction
+        :param tip: The current chain tip (see: query_tip); queried if not given
+        :return: Slot after which a transaction built now shall be invalid
+        """
+        if tip is None:
+            tip = cls.query_tip()
+        return int(tip['slot']) + settings.DEFAULT_TRANSACTION_TTL
 
     @classmethod
     def query_utxos(cls, address) -> list:
         utxos = []
 
-        response = CardanoCLI.run(
-            'query utxo',
-            address=address,
-            network=settings.NETWORK
-        )
+        # When given an output file, cardano-cli writes the UTxO set as JSON
+        # (rather than as an ASCII table) of the form:
+        # {"<TxHash>#<TxIx>": {"address": ..., "value": {"lovelace": <int>, "<policy_id>": {"<asset_name>": <int>}}}}
+        response = CardanoCLI.run('query utxo', text=False, **{
+            'address': address,
+            'network': settings.NETWORK,
+            'out-file': '/dev/stdout',
+        })
 
-        lines = response.split('\n')
-        for line in lines[2:]:
-            utxo_match = UTXO_RE.match(line)
-            utxo_info = {
-                'TxHash': utxo_match[1],
-                'TxIx': utxo_match[2],
-                'Tokens': {},
-            }
-
-            tokens = utxo_match[3].split('+')
-            for token in tokens:
-                token_match = ASSET_COUNT_RE.match(token.strip())
-                if token_match:
-                    asset_count = int(token_match[1])
-                    asset_type = token_match[2]
-                    utxo_info['Tokens'][asset_type] = asset_count
-
-            utxos.append(utxo_info)
+        for tx_in, tx_out in json_loads(response).items():
+            tx_hash, tx_index = tx_in.split('#')
+            tokens = {}
+
+            for unit, amount in tx_out['value'].items():
+                if isinstance(amount, dict):
+                    # Native token quantities, keyed by (hexadecimal) asset name
+                    for asset_name, asset_count in amount.items():
+                        asset_id = f'{unit}.{asset_name}' if asset_name else unit
+                        tokens[asset_id] = asset_count
+                else:
+                    tokens[unit] = amount
+
+            utxos.append({
+                'TxHash': tx_hash,
+                'TxIx': tx_index,
+                'Tokens': tokens,
+            })
 
         return utxos
 
     @classmethod
     def address_info(cls, address):
-        response = CardanoCLI.run('address info', address=address)
-        return json.loads(response)
+        # The information is cached (see: _address_info); hand out a copy
+        # so that callers cannot alter the cached entry.
+        return dict(_address_info(address))
 
     @classmethod
     def tx_info(cls, tx_file):
@@ -127,14 +354,14 @@ class CardanoUtils:
          - asset_names: Distinct set of asset names
         """
         asset_ids = []
-        tokens = defaultdict(int)
+        tokens = {}
         distinct_policy_ids = set()
         distinct_asset_names = set()
 
         for bundle_entry in TOKEN_BUNDLE_RE.findall(token_bundle):
             bundle_entry = bundle_entry.strip('"')
             token_count, asset_id = bundle_entry.split(' ')
-            tokens[asset_id] += int(token_count)
+            tokens[asset_id] = tokens.get(asset_id, 0) + int(token_count)
             asset_ids.append(asset_id)
 
             try: